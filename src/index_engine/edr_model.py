@@ -1,99 +1,139 @@
 from __future__ import annotations
 
-import math
-from typing import Any, List, cast
+from typing import Any, Dict, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 
 from .parameters import EDRParams
 
 
-def _safe_div(a: pd.Series, b: pd.Series) -> pd.Series:
-    b2 = b.replace({0: pd.NA})
-    return (a / b2).fillna(0.0)
+def _safe_div(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return np.divide(a, b, out=np.zeros_like(a), where=b != 0)
 
 
-def _extract_prices(x: Any) -> List[float]:
-    if not x or not isinstance(x, list):
-        return []
-    out: List[float] = []
-    for it in x:
-        if isinstance(it, dict) and it.get("price") is not None:
-            try:
-                out.append(float(it["price"]))
-            except Exception:
-                pass
-    return out
+def _float_col(df: pd.DataFrame, col: str) -> np.ndarray:
+    """Column as float64 array with missing -> 0.0; absent column -> zeros."""
+    if col in df.columns:
+        return df[col].to_numpy(dtype=np.float64, na_value=0.0)
+    return np.zeros(len(df), dtype=np.float64)
 
 
-def add_ccu(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
-    if "avg_ccu" in df.columns:
-        df["avg_ccu"] = df["avg_ccu"].fillna(0).astype(float)
-        return df
-    for c in ("players", "playing", "ccu", "concurrentPlayers"):
+def _flatten_prices(sides: List[List[Any]], n: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Collects prices from the item-list columns present (game_passes, dev_products) for every
+    row into one flat float array. Absent columns are simply not passed in.
+    Returns (prices, counts, n_items) where counts[i] is the number of prices belonging to
+    row i and n_items[i] the number of listed items (priced or not).
+
+    Items are [{"price": ...}, ...]; the loop only gathers raw price values; numeric
+    conversion and validity filtering happen once over the whole flat array.
+    """
+    raw: List[Any] = []
+    row_of: List[int] = []
+    n_items = np.zeros(n, dtype=np.int64)
+    for i, row in enumerate(zip(*sides)):
+        for items in row:
+            if not isinstance(items, list) or not items:
+                continue
+            n_items[i] += len(items)
+            vals = [it.get("price") for it in items if isinstance(it, dict)]
+            raw.extend(vals)
+            row_of.extend([i] * len(vals))
+
+    converted = pd.to_numeric(pd.Series(raw, dtype=object), errors="coerce")
+    prices = converted.to_numpy(dtype=np.float64, na_value=np.nan)
+    valid = ~np.isnan(prices)
+    gid = np.asarray(row_of, dtype=np.int64)[valid]
+    counts = np.bincount(gid, minlength=n).astype(np.int64)
+    return prices[valid], counts, n_items
+
+
+def _price_stats(prices: np.ndarray, counts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Per-row median price and coefficient of variation over a flat (prices, counts) layout.
+    Rows without prices (or with a non-positive mean) get 0.0.
+    """
+    n = len(counts)
+    medians = np.zeros(n, dtype=np.float64)
+    dispersions = np.zeros(n, dtype=np.float64)
+    if prices.size == 0:
+        return medians, dispersions
+
+    gid = np.repeat(np.arange(n), counts)
+    starts = np.cumsum(counts) - counts
+    has = counts > 0
+
+    # Median: sort within each row segment in one pass, then pick the middle element(s)
+    sorted_prices = prices[np.lexsort((prices, gid))]
+    c = counts[has]
+    lo = starts[has] + (c - 1) // 2
+    hi = starts[has] + c // 2
+    medians[has] = (sorted_prices[lo] + sorted_prices[hi]) / 2.0
+
+    # Dispersion: population std / mean
+    safe_counts = np.where(has, counts, 1)
+    means = np.bincount(gid, weights=prices, minlength=n) / safe_counts
+    sq = np.bincount(gid, weights=(prices - means[gid]) ** 2, minlength=n) / safe_counts
+    pos = has & (means > 0)
+    dispersions[pos] = np.sqrt(sq[pos]) / means[pos]
+
+    return medians, dispersions
+
+
+def _ccu_array(df: pd.DataFrame) -> np.ndarray:
+    for c in ("avg_ccu", "players", "playing", "ccu", "concurrentPlayers"):
         if c in df.columns:
-            df["avg_ccu"] = df[c].fillna(0).astype(float)
-            return df
-    df["avg_ccu"] = 0.0
-    return df
+            return _float_col(df, c)
+    return np.zeros(len(df), dtype=np.float64)
 
 
-def add_monetization_features(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
+def _monetization_arrays(df: pd.DataFrame) -> Tuple[Optional[np.ndarray], np.ndarray, np.ndarray]:
+    """
+    Returns (monetization_count, median_price, price_dispersion).
+    monetization_count is None when df already carries that column (left untouched).
+    """
+    sides = [df[c].tolist() for c in ("game_passes", "dev_products") if c in df.columns]
+    prices, counts, n_items = _flatten_prices(sides, len(df))
+    medians, dispersions = _price_stats(prices, counts)
 
-    # Monetization count
+    mc: Optional[np.ndarray] = None
     if "monetization_count" not in df.columns:
         if "num_gamepasses" in df.columns or "num_devproducts" in df.columns:
-            num_gp = df["num_gamepasses"].fillna(0).astype(float) if "num_gamepasses" in df.columns else pd.Series([0.0] * len(df))
-            num_dp = df["num_devproducts"].fillna(0).astype(float) if "num_devproducts" in df.columns else pd.Series([0.0] * len(df))
-            df["monetization_count"] = num_gp + num_dp
+            mc = _float_col(df, "num_gamepasses") + _float_col(df, "num_devproducts")
         else:
-            gp = cast(pd.Series, df["game_passes"] if "game_passes" in df.columns else pd.Series([None] * len(df)))
-            dp = cast(pd.Series, df["dev_products"] if "dev_products" in df.columns else pd.Series([None] * len(df)))
-            df["monetization_count"] = gp.apply(lambda v: len(v) if isinstance(v, list) else 0) + dp.apply(
-                lambda v: len(v) if isinstance(v, list) else 0
-            )
-
-    # Price surface
-    gp_prices = cast(pd.Series, (df["game_passes"] if "game_passes" in df.columns else pd.Series([None] * len(df))).apply(_extract_prices))
-    dp_prices = cast(pd.Series, (df["dev_products"] if "dev_products" in df.columns else pd.Series([None] * len(df))).apply(_extract_prices))
-    all_prices = gp_prices + dp_prices
-
-    def median(prices: List[float]) -> float:
-        if not prices:
-            return 0.0
-        s = sorted(prices)
-        mid = len(s) // 2
-        return float(s[mid]) if len(s) % 2 == 1 else float((s[mid - 1] + s[mid]) / 2)
-
-    def dispersion(prices: List[float]) -> float:
-        if not prices:
-            return 0.0
-        m = sum(prices) / len(prices)
-        if m <= 0:
-            return 0.0
-        var = sum((p - m) ** 2 for p in prices) / len(prices)
-        return float(math.sqrt(var) / m)
-
-    df["median_price"] = all_prices.apply(median)
-    df["price_dispersion"] = all_prices.apply(dispersion)
+            mc = n_items
+    return mc, medians, dispersions
 
-    return df
 
+def _engagement_array(df: pd.DataFrame, params: EDRParams) -> np.ndarray:
+    visits = _float_col(df, "visits")
+    fav_rate = _safe_div(_float_col(df, "favorites"), visits)
+    like_rate = _safe_div(_float_col(df, "likes"), visits)
 
-def add_engagement_score(df: pd.DataFrame, params: EDRParams) -> pd.DataFrame:
+    raw = 0.5 * (fav_rate + like_rate)
+    return np.clip(raw * params.engagement_scale, 0.0, params.engagement_cap)
+
+
+def add_ccu(df: pd.DataFrame) -> pd.DataFrame:
     df = df.copy()
+    df["avg_ccu"] = _ccu_array(df)
+    return df
 
-    visits = cast(pd.Series, df["visits"].fillna(0).astype(float) if "visits" in df.columns else pd.Series([0.0] * len(df), dtype=float))
-    favorites = cast(pd.Series, df["favorites"].fillna(0).astype(float) if "favorites" in df.columns else pd.Series([0.0] * len(df), dtype=float))
-    likes = cast(pd.Series, df["likes"].fillna(0).astype(float) if "likes" in df.columns else pd.Series([0.0] * len(df), dtype=float))
 
-    fav_rate = _safe_div(favorites, visits)
-    like_rate = _safe_div(likes, visits)
+def add_monetization_features(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.copy()
+    mc, medians, dispersions = _monetization_arrays(df)
+    if mc is not None:
+        df["monetization_count"] = mc
+    df["median_price"] = medians
+    df["price_dispersion"] = dispersions
+    return df
 
-    raw = cast(pd.Series, 0.5 * (fav_rate + like_rate))
-    df["engagement_score"] = (raw * params.engagement_scale).clip(0.0, params.engagement_cap)
+
+def add_engagement_score(df: pd.DataFrame, params: EDRParams) -> pd.DataFrame:
+    df = df.copy()
+    df["engagement_score"] = _engagement_array(df, params)
     return df
 
 
@@ -102,24 +142,39 @@ def compute_edr_daily(df: pd.DataFrame, params: EDRParams) -> pd.DataFrame:
     Computes daily EDR on a snapshot (one date).
     Output includes:
       dau_est, pcr, aspu, spend_revenue, premium_revenue, edr_raw
+
+    Inputs are read as float64 arrays once and every derived column is written back
+    with a single assign (one block insert instead of a column write per feature).
     """
-    out = df.copy()
-    out = add_ccu(out)
-    out = add_monetization_features(out)
-    out = add_engagement_score(out, params)
+    ccu = _ccu_array(df)
+    mc_new, mp, disp = _monetization_arrays(df)
+    mc = mc_new if mc_new is not None else _float_col(df, "monetization_count")
+    eng = _engagement_array(df, params)
 
-    out["dau_est"] = (params.alpha * out["avg_ccu"]).clip(lower=0.0)
+    dau = np.maximum(params.alpha * ccu, 0.0)
 
-    # PCR v1
-    out["pcr"] = (
-        params.base_rate * (1.0 + out["monetization_count"]).apply(lambda x: math.log(x))
-    ).clip(lower=params.pcr_floor, upper=params.pcr_cap)
+    # PCR v1: base_rate * log(1 + monetization_count)
+    pcr = np.clip(params.base_rate * np.log1p(mc), params.pcr_floor, params.pcr_cap)
 
     # ASPU v1
-    out["aspu"] = (out["median_price"] * (1.0 + out["price_dispersion"])).clip(lower=0.0)
-
-    out["spend_revenue"] = out["dau_est"] * out["pcr"] * out["aspu"]
-    out["premium_revenue"] = params.gamma * out["dau_est"] * out["engagement_score"]
-    out["edr_raw"] = (out["spend_revenue"] + out["premium_revenue"]).clip(lower=0.0)
-
-    return out
\ No newline at end of file
+    aspu = np.maximum(mp * (1.0 + disp), 0.0)
+
+    spend = dau * pcr * aspu
+    premium = params.gamma * dau * eng
+
+    derived: Dict[str, np.ndarray] = {"avg_ccu": ccu}
+    if mc_new is not None:
+        derived["monetization_count"] = mc_new
+    derived.update(
+        median_price=mp,
+        price_dispersion=disp,
+        engagement_score=eng,
+        dau_est=dau,
+        pcr=pcr,
+        aspu=aspu,
+        spend_revenue=spend,
+        premium_revenue=premium,
+        edr_raw=np.maximum(spend + premium, 0.0),
+    )
+    # assign() returns a new frame, so the caller's df is never mutated
+    return df.assign(**derived)
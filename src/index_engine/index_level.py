@@ -15,24 +15,34 @@ def _as_df(obj: object) -> pd.DataFrame:
     return pd.DataFrame()
 
 
+def coerce_numeric(s: pd.Series) -> pd.Series:
+    """pd.to_numeric(errors="coerce"), skipped when the column is already numeric."""
+    if pd.api.types.is_numeric_dtype(s):
+        return s
+    return cast(pd.Series, pd.to_numeric(s, errors="coerce"))
+
+
 def _series_float(df: pd.DataFrame, col: str, default: float = 0.0) -> pd.Series:
     if col in df.columns:
-        raw = pd.to_numeric(df[col], errors="coerce")
-        s = pd.Series(raw, index=df.index, dtype="float64").fillna(default)
-        return cast(pd.Series, s)
-    return pd.Series([default] * len(df), index=df.index, dtype="float64")
+        return coerce_numeric(df[col]).astype("float64").fillna(default)
+    return pd.Series(default, index=df.index, dtype="float64")
 
 
-def _series_dt(df: pd.DataFrame, col: str) -> pd.Series:
+def series_dt(df: pd.DataFrame, col: str) -> pd.Series:
     """
     Normalize to pandas Timestamp (normalized to midnight).
     Returns Series[Timestamp] aligned to df.index.
     """
     if col not in df.columns:
-        return pd.Series([pd.NaT] * len(df), index=df.index, dtype="datetime64[ns]")
-    raw = pd.to_datetime(df[col], errors="coerce")
-    s = pd.Series(raw, index=df.index).dt.normalize()
-    return cast(pd.Series, s)
+        return pd.Series(pd.NaT, index=df.index, dtype="datetime64[ns]")
+    col_s = df[col]
+    if pd.api.types.is_datetime64_any_dtype(col_s):
+        return cast(pd.Series, col_s.dt.normalize())
+    # Few distinct dates over many rows: parse + normalize each distinct value once, then broadcast
+    codes, uniques = pd.factorize(col_s)
+    parsed = pd.DatetimeIndex(pd.to_datetime(uniques, errors="coerce")).normalize()
+    raw = parsed.take(codes, allow_fill=True, fill_value=pd.NaT)
+    return pd.Series(raw, index=df.index)
 
 
 def _filter_df(df: pd.DataFrame, mask: pd.Series) -> pd.DataFrame:
@@ -69,8 +79,8 @@ def build_index_level_series(
             raise ValueError(f"membership_history missing required column: {col}")
 
     # --- Normalize dates + numeric types ---
-    snaps["snapshot_date"] = _series_dt(snaps, "snapshot_date")
-    mem["rebalance_date"] = _series_dt(mem, "rebalance_date")
+    snaps["snapshot_date"] = series_dt(snaps, "snapshot_date")
+    mem["rebalance_date"] = series_dt(mem, "rebalance_date")
 
     snaps["edr_raw"] = _series_float(snaps, "edr_raw", 0.0)
     mem["weight"] = _series_float(mem, "weight", 0.0)
@@ -1,13 +1,19 @@
 from __future__ import annotations
 
-import json
-import re
+import os
 from pathlib import Path
 from typing import Any, Dict, List, Tuple, Union
 
+import numpy as np
+import orjson
 import pandas as pd
+import pyarrow as pa
 
-DATE_RE = re.compile(r"(\d{4}-\d{2}-\d{2})")
+STRING_COLUMNS = ("name", "developer")
+
+
+def _is_iso_date(s: str) -> bool:
+    return len(s) == 10 and s[4] == "-" and s[7] == "-" and s.replace("-", "").isdigit()
 
 
 def discover_pruned_run_files(runs_dir: Union[str, Path]) -> List[Tuple[str, Path]]:
@@ -15,6 +21,10 @@ def discover_pruned_run_files(runs_dir: Union[str, Path]) -> List[Tuple[str, Pat
     Matches your structure:
       runs/YYYY-MM-DD/pruned/YYYY-MM-DD_top-earning_top1500_enriched_pruned.json
 
+    The snapshot date is the run directory name. Walks the two levels with os.scandir
+    (no glob / per-entry Path objects). Unlike the previous glob, dot-prefixed run files are
+    skipped (e.g. macOS "._*.json" resource forks); day directories must be YYYY-MM-DD.
+
     Returns list of (snapshot_date_str, filepath) sorted by date.
     """
     runs_dir = Path(runs_dir)
@@ -22,13 +32,19 @@ def discover_pruned_run_files(runs_dir: Union[str, Path]) -> List[Tuple[str, Pat
         raise FileNotFoundError(f"Runs dir not found: {runs_dir}")
 
     files: List[Tuple[str, Path]] = []
-    for fp in runs_dir.glob("*/pruned/*.json"):
-        m = DATE_RE.search(str(fp))
-        if not m:
-            continue
-        files.append((m.group(1), fp))
+    with os.scandir(runs_dir) as days:
+        for day in days:
+            if not _is_iso_date(day.name) or not day.is_dir():
+                continue
+            pruned_dir = os.path.join(day.path, "pruned")
+            if not os.path.isdir(pruned_dir):
+                continue
+            with os.scandir(pruned_dir) as entries:
+                for e in entries:
+                    if e.name.endswith(".json") and not e.name.startswith(".") and e.is_file():
+                        files.append((day.name, Path(e.path)))
 
-    files.sort(key=lambda x: x[0])
+    files.sort()
     return files
 
 
@@ -40,8 +56,8 @@ def load_pruned_file(path: Union[str, Path], snapshot_date: str) -> pd.DataFrame
       - dict[str, dict] keyed by id
     """
     path = Path(path)
-    with path.open("r", encoding="utf-8") as f:
-        obj: Any = json.load(f)
+    with path.open("rb") as f:
+        obj: Any = orjson.loads(f.read())
 
     if isinstance(obj, dict) and "data" in obj and isinstance(obj["data"], list):
         rows = obj["data"]
@@ -53,7 +69,8 @@ def load_pruned_file(path: Union[str, Path], snapshot_date: str) -> pd.DataFrame
         raise ValueError(f"Unsupported JSON shape in {path}")
 
     df = pd.DataFrame(rows)
-    df["snapshot_date"] = pd.to_datetime(snapshot_date).date()
+    # Native datetime64[ns] column (not python date objects) so compares/sorts/merges stay vectorized
+    df["snapshot_date"] = np.full(len(df), np.datetime64(snapshot_date), dtype="datetime64[ns]")
 
     # Normalize IDs
     if "universeId" not in df.columns:
@@ -62,4 +79,11 @@ def load_pruned_file(path: Union[str, Path], snapshot_date: str) -> pd.DataFrame
         elif "id" in df.columns:
             df["universeId"] = df["id"]
 
+    # Tight dtypes up front: nullable int ids hash/merge natively, Arrow strings skip Python objects
+    if "universeId" in df.columns:
+        df["universeId"] = pd.to_numeric(df["universeId"], errors="coerce").astype("Int64")
+    for c in STRING_COLUMNS:
+        if c in df.columns:
+            df[c] = df[c].astype(pd.ArrowDtype(pa.string()))
+
     return df
\ No newline at end of file
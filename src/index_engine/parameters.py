@@ -54,6 +54,8 @@ class RebalanceParams:
 class StorageParams:
     # Where derived data lives
     index_data_dir: str = "index_data"
+    snapshots_dir: str = "snapshots"  # hive-partitioned by snapshot_date
+    # Legacy single-file snapshots; migrated into snapshots_dir on the next run, then removed
     snapshots_file: str = "snapshots.parquet"
     features_file: str = "features.parquet"
     membership_file: str = "membership.parquet"
\ No newline at end of file
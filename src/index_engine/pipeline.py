@@ -1,18 +1,29 @@
 # src/index_engine/pipeline.py
 from __future__ import annotations
 
+import hashlib
+import json
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
 from pathlib import Path
-from typing import Optional, cast, List
+from typing import Dict, Optional, Tuple, cast, List
 
+import numpy as np
+import orjson
 import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
 
 from .parameters import EDRParams, RollingParams, RebalanceParams, StorageParams
-from .io_runs import load_pruned_file  # <- your loader: (path: Path) -> pd.DataFrame
+from .io_runs import STRING_COLUMNS, discover_pruned_run_files, load_pruned_file  # <- your loader: (path: Path) -> pd.DataFrame
 from .edr_model import compute_edr_daily
 from .rolling_features import compute_rolling_features
 from .rebalance import rebalance_weekly
 from .report import write_weekly_report
-from .index_level import build_index_level_series, write_index_level_exports
+from .index_level import coerce_numeric, series_dt, build_index_level_series, write_index_level_exports
 
 
 def _as_df(obj: object) -> pd.DataFrame:
@@ -34,8 +45,119 @@ def _find_pruned_files(runs_dir: Path) -> list[Path]:
     """
     if not runs_dir.exists():
         return []
-    files = sorted(runs_dir.glob("*/pruned/*.json"))
-    return files
+    return [fp for _, fp in discover_pruned_run_files(runs_dir)]
+
+
+# Version of the per-day partition contents, part of every partition key. Bump it whenever
+# compute_edr_daily or load_pruned_file output changes (values, columns or dtypes), so that
+# every day still under runs/ is recomputed instead of keeping its stale partition.
+SNAPSHOT_VERSION = 1
+
+
+def _params_key(edr_params: EDRParams) -> str:
+    payload = json.dumps(asdict(edr_params), sort_keys=True).encode("utf-8")
+    return hashlib.sha1(payload).hexdigest()[:8]
+
+
+def _compute_day_table(f: Path, run_date: str, edr_params: EDRParams) -> pa.Table:
+    # Fresh frame per file, not shared with anything else (snapshot_date already datetime64[ns])
+    df_day = _as_df(load_pruned_file(f, run_date))
+
+    # Compute EDR + derived columns
+    df_day = compute_edr_daily(df_day, edr_params)
+
+    return pa.Table.from_pandas(df_day, preserve_index=False)
+
+
+def _day_key(f: Path, run_date: str, params_key: str) -> str:
+    """Content address of one run file: (run date, snapshot version, file content, EDR params)."""
+    file_key = hashlib.sha1(f.read_bytes()).hexdigest()[:16]
+    return f"{run_date}_v{SNAPSHOT_VERSION}_{file_key}_{params_key}"
+
+
+def _process_day(job: Tuple[Path, str, EDRParams, Path]) -> str:
+    """
+    Process-pool entry point (must stay top-level so it pickles).
+    Computes one run file and writes its partition file itself, so no table travels back.
+    """
+    f, run_date, edr_params, part_fp = job
+    table = _compute_day_table(f, run_date, edr_params)
+    part_fp.parent.mkdir(parents=True, exist_ok=True)
+    # snapshot_date lives in the directory name (hive partition), not in the file.
+    # The key file name marks the day as current, so it must only appear once complete:
+    # write to a dot-prefixed temp name (ignored by the dataset) and rename it into place.
+    tmp_fp = part_fp.with_name(f".{part_fp.name}.tmp")
+    pq.write_table(table.drop_columns(["snapshot_date"]), tmp_fp)
+    os.replace(tmp_fp, part_fp)
+    return part_fp.name
+
+
+SNAPSHOT_PARTITIONING = ds.partitioning(pa.schema([("snapshot_date", pa.date32())]), flavor="hive")
+
+
+def _partition_dir(snap_dir: Path, run_date: str) -> Path:
+    return snap_dir / f"snapshot_date={run_date}"
+
+
+def _migrate_legacy_snapshots(legacy_fp: Path, snap_dir: Path) -> None:
+    """
+    One-time move of the old single-file snapshots.parquet into the partitioned layout.
+    Days that already have a partition win; each migrated day becomes <day>/legacy.parquet,
+    which is replaced like any stale partition if that day is still under runs/.
+    Raises (and keeps the legacy file) if snapshot_date is missing or cannot be parsed, since
+    those rows would have no partition to go to.
+    """
+    if not legacy_fp.exists():
+        return
+    legacy = pd.read_parquet(legacy_fp)
+    if "snapshot_date" not in legacy.columns:
+        raise ValueError(f"{legacy_fp}: no snapshot_date column; cannot migrate (legacy file left in place)")
+    days = pd.to_datetime(legacy["snapshot_date"], errors="coerce").dt.strftime("%Y-%m-%d")
+    if days.isna().any():
+        raise ValueError(
+            f"{legacy_fp}: {int(days.isna().sum())} rows have an unparseable snapshot_date; "
+            "fix or drop them before migrating (legacy file left in place)"
+        )
+    for run_date, day_df in legacy.groupby(days):
+        part_dir = _partition_dir(snap_dir, str(run_date))
+        if part_dir.is_dir():
+            continue
+        # Same temp-then-rename as _process_day: the directory only appears once complete
+        tmp_dir = snap_dir / f".{part_dir.name}.tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        _ensure_dir(tmp_dir)
+        table = pa.Table.from_pandas(day_df.drop(columns=["snapshot_date"]), preserve_index=False)
+        pq.write_table(table, tmp_dir / "legacy.parquet")
+        os.replace(tmp_dir, part_dir)
+    legacy_fp.unlink()
+    print(f"[index_engine] Migrated {legacy_fp} into {snap_dir}")
+
+
+def read_snapshots(snap_dir: Path) -> pd.DataFrame:
+    """
+    Reads the hive-partitioned snapshots dataset (snapshots/snapshot_date=YYYY-MM-DD/*.parquet).
+    Per-day files may differ in columns/types; schemas are unified (permissive) before the scan.
+    """
+    if not snap_dir.is_dir():
+        return pd.DataFrame()
+    dataset = ds.dataset(snap_dir, format="parquet", partitioning=SNAPSHOT_PARTITIONING)
+    if not dataset.files:
+        return pd.DataFrame()
+    # pandas metadata is dropped: it would come from whichever file is first (e.g. a migrated
+    # legacy day) and decide the dtypes; they are set explicitly below, as the loader sets them
+    schema = pa.unify_schemas(
+        [pq.read_schema(fp) for fp in dataset.files] + [SNAPSHOT_PARTITIONING.schema],
+        promote_options="permissive",
+    ).remove_metadata()
+    dataset = ds.dataset(snap_dir, format="parquet", partitioning=SNAPSHOT_PARTITIONING, schema=schema)
+    snapshots = dataset.to_table().to_pandas(self_destruct=True, split_blocks=True, date_as_object=False)
+    snapshots["snapshot_date"] = snapshots["snapshot_date"].astype("datetime64[ns]")
+    if "universeId" in snapshots.columns:
+        snapshots["universeId"] = snapshots["universeId"].astype("Int64")
+    for c in STRING_COLUMNS:
+        if c in snapshots.columns:
+            snapshots[c] = snapshots[c].astype(pd.ArrowDtype(pa.string()))
+    return snapshots
 
 
 def update_snapshots_from_runs(
@@ -44,50 +166,56 @@ def update_snapshots_from_runs(
     edr_params: EDRParams,
 ) -> pd.DataFrame:
     """
-    Reads all runs under runs_dir, computes per-day snapshots with EDR, and appends to snapshots.parquet.
-    Rebuild approach: load all files each run (simple + consistent).
+    Reads all runs under runs_dir, computes per-day snapshots with EDR, and appends them to the
+    partitioned snapshots dataset (index_data/snapshots/snapshot_date=YYYY-MM-DD/).
+
+    Only days whose partition is missing or stale (run file, EDR params or SNAPSHOT_VERSION
+    changed) are recomputed and rewritten; unchanged partitions are not touched. Days that are
+    no longer under runs_dir keep their partition. Returns the full dataset.
     """
     runs_path = Path(runs_dir)
     pruned_files = _find_pruned_files(runs_path)
 
-    rows: list[pd.DataFrame] = []
-    for f in pruned_files:
-        # Expect path like runs/2026-01-05/pruned/...json
-        run_date = f.parent.parent.name  # YYYY-MM-DD
-        df_day = load_pruned_file(f, run_date)
-        df_day = _as_df(df_day).copy()
-
-        df_day["snapshot_date"] = run_date
-
-        # Compute EDR + derived columns
-        df_day = compute_edr_daily(df_day, edr_params)
+    snap_dir = Path(storage.index_data_dir) / storage.snapshots_dir
+    _ensure_dir(snap_dir)
+    _migrate_legacy_snapshots(Path(storage.index_data_dir) / storage.snapshots_file, snap_dir)
 
-        rows.append(df_day)
-
-    if rows:
-        snapshots = pd.concat(rows, ignore_index=True)
+    # Expect path like runs/2026-01-05/pruned/...json -> run date is the day directory
+    by_date: Dict[str, List[Path]] = {}
+    for f in pruned_files:
+        by_date.setdefault(f.parent.parent.name, []).append(f)
+
+    # A partition is current when it holds exactly one file per distinct run file, named by its
+    # key (run date, snapshot version, file content, EDR params): the partition files double as
+    # the per-day cache
+    params_key = _params_key(edr_params)
+    jobs: List[Tuple[Path, str, EDRParams, Path]] = []
+    for run_date, files in by_date.items():
+        keys = [_day_key(f, run_date, params_key) for f in files]
+        part_dir = _partition_dir(snap_dir, run_date)
+        current = {fp.name for fp in part_dir.glob("*.parquet")} if part_dir.is_dir() else set()
+        if current == {f"{k}.parquet" for k in keys}:
+            continue
+        shutil.rmtree(part_dir, ignore_errors=True)
+        # Identical run files share a key (and a target file): compute each key once
+        for k, f in dict(zip(keys, files)).items():
+            jobs.append((f, run_date, edr_params, part_dir / f"{k}.parquet"))
+
+    # Days are independent: fan out over processes. Each job writes its own partition file, so
+    # only one day is ever held in memory per worker and nothing is concatenated across days.
+    # Chunks are sized so every worker gets at least one; a single chunk stays in-process
+    workers = min(os.cpu_count() or 1, len(jobs))
+    chunksize = max(1, len(jobs) // max(workers, 1))
+    if len(jobs) > chunksize:
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            for _ in ex.map(_process_day, jobs, chunksize=chunksize):
+                pass
     else:
-        snapshots = pd.DataFrame()
+        for job in jobs:
+            _process_day(job)
 
-    # Normalize snapshot_date type
-    if not snapshots.empty and "snapshot_date" in snapshots.columns:
-        snapshots["snapshot_date"] = pd.to_datetime(snapshots["snapshot_date"], errors="coerce").dt.date.astype(str)
+    return read_snapshots(snap_dir)
 
-    out_dir = Path(storage.index_data_dir)
-    _ensure_dir(out_dir)
-
-    snap_path = out_dir / storage.snapshots_file
-    snapshots.to_parquet(snap_path, index=False)
-    return snapshots
-
-def _series_dt_date(df: pd.DataFrame, col: str) -> pd.Series:
-    """Return a date (python date) Series aligned to df.index; missing -> NaT."""
-    if col not in df.columns:
-        return pd.Series([pd.NaT] * len(df), index=df.index, dtype="datetime64[ns]")
-    raw = pd.to_datetime(df[col], errors="coerce")
-    # normalize to midnight then convert to date via .dt.date (still Series)
-    s = pd.Series(raw, index=df.index).dt.normalize()
-    return cast(pd.Series, s)
 
 def rebuild_features(
     snapshots: pd.DataFrame,
@@ -113,6 +241,15 @@ def _read_parquet_if_exists(path: Path) -> pd.DataFrame:
     return pd.DataFrame()
 
 
+def _json_default(obj: object) -> object:
+    """orjson fallback for pandas scalars: NA/NaT -> null, Timestamp -> ISO string."""
+    if isinstance(obj, pd.Timestamp):
+        return obj.isoformat()
+    if pd.isna(obj):  # type: ignore[arg-type]
+        return None
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
 def _write_latest_copy(src: Path, dst: Path) -> None:
     dst.write_text(src.read_text(encoding="utf-8"), encoding="utf-8")
 
@@ -155,21 +292,20 @@ def export_rebalance_outputs(
     latest_snap = pd.DataFrame({"universeId": []})
     if (not snapshots.empty) and ("universeId" in snapshots.columns) and ("snapshot_date" in snapshots.columns):
         snapshots = snapshots.copy()
-        snapshots["snapshot_date"] = _series_dt_date(snapshots, "snapshot_date").dt.date  # Series[date]
+        snapshots["snapshot_date"] = series_dt(snapshots, "snapshot_date")
 
-        asof = pd.to_datetime(reb_date_iso).date()
+        asof = np.datetime64(reb_date_iso, "ns")
         mask = cast(pd.Series, snapshots["snapshot_date"] <= asof)
         snaps_asof = snapshots.loc[mask].copy()
 
         if not snaps_asof.empty:
             snaps_asof = snaps_asof.sort_values(by=["universeId", "snapshot_date"], kind="stable")
-            # groupby/tail can be typed weirdly; cast it back
-            latest_snap = cast(
-                pd.DataFrame,
-                snaps_asof.groupby("universeId", as_index=False).tail(1),
-            )
+            # last row per universeId after the sort == latest snapshot (groupby drops NA keys; so do we)
+            latest_snap = snaps_asof.loc[snaps_asof["universeId"].notna()].drop_duplicates("universeId", keep="last")
 
-    # --- merge membership + latest snapshot ---
+    # --- merge membership + latest snapshot (same nullable int key on both sides) ---
+    result_membership["universeId"] = coerce_numeric(result_membership["universeId"]).astype("Int64")
+    latest_snap["universeId"] = coerce_numeric(latest_snap["universeId"]).astype("Int64")
     export_df = cast(
         pd.DataFrame,
         result_membership.merge(latest_snap, on="universeId", how="left", suffixes=("", "_snap")),
@@ -180,9 +316,11 @@ def export_rebalance_outputs(
         wanted: List[str] = ["universeId", "score", "edr_7d_mean", "edr_mom", "edr_14d_vol", "coverage_7d"]
         cols: List[str] = [c for c in wanted if c in ranked_universe.columns]
         if len(cols) > 1:
+            ranked_cols = ranked_universe.loc[:, cols].copy()
+            ranked_cols["universeId"] = coerce_numeric(ranked_cols["universeId"]).astype("Int64")
             export_df = cast(
                 pd.DataFrame,
-                export_df.merge(ranked_universe.loc[:, cols], on="universeId", how="left"),
+                export_df.merge(ranked_cols, on="universeId", how="left"),
             )
 
     # --- column selection ---
@@ -199,14 +337,12 @@ def export_rebalance_outputs(
 
     # normalize rebalance_date column to ISO strings
     if "rebalance_date" in export_df.columns:
-        export_df["rebalance_date"] = export_df["rebalance_date"].apply(
-            lambda x: str(pd.to_datetime(x, errors="coerce").date())
-        )
+        reb_dt = pd.to_datetime(export_df["rebalance_date"], errors="coerce")
+        export_df["rebalance_date"] = reb_dt.dt.strftime("%Y-%m-%d").fillna("NaT")
 
     # sort by rank
     if "rank" in export_df.columns:
-        raw_rank = pd.to_numeric(export_df["rank"], errors="coerce")
-        export_df["rank"] = pd.Series(raw_rank, index=export_df.index)
+        export_df["rank"] = coerce_numeric(export_df["rank"])
         by_cols: List[str] = ["rank"]
         export_df = export_df.sort_values(by=by_cols, kind="stable").reset_index(drop=True)
 
@@ -215,7 +351,13 @@ def export_rebalance_outputs(
     dated_json = exports_day / "rte100.json"
 
     export_df.to_csv(dated_csv, index=False)
-    export_df.to_json(dated_json, orient="records", indent=2)
+    dated_json.write_bytes(
+        orjson.dumps(
+            export_df.to_dict(orient="records"),
+            option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY,
+            default=_json_default,
+        )
+    )
 
     print(f"[index_engine] Exported: {dated_csv}")
     print(f"[index_engine] Exported: {dated_json}")
@@ -263,8 +405,7 @@ def run_weekly_rebalance(
     membership_all.to_parquet(membership_path, index=False)
 
     # --- Export constituents: dated + latest ---
-    snapshots_path = out_dir / storage.snapshots_file
-    snapshots = _read_parquet_if_exists(snapshots_path)
+    snapshots = read_snapshots(out_dir / storage.snapshots_dir)
 
     export_df = export_rebalance_outputs(
     result_membership_obj=result.membership,
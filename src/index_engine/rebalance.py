@@ -28,7 +28,7 @@ def _score_v1(latest: pd.DataFrame) -> pd.Series:
     edr_7d_all_na = bool(latest["edr_7d_mean"].isna().all()) if not edr_7d_missing else True
     if edr_7d_missing or edr_7d_all_na:
         latest = latest.copy()
-        edr_raw_series = cast(pd.Series, latest["edr_raw"]) if "edr_raw" in latest.columns else pd.Series([0.0] * len(latest), dtype=float)
+        edr_raw_series = cast(pd.Series, latest["edr_raw"]) if "edr_raw" in latest.columns else pd.Series(0.0, index=latest.index, dtype=float)
         latest["edr_7d_mean"] = edr_raw_series
     # -- Higher is better: edr_7d_mean, edr_mom
     # -- Lower is better: edr_14d_vol
@@ -40,13 +40,13 @@ def _score_v1(latest: pd.DataFrame) -> pd.Series:
     edr_7d = (
         latest["edr_7d_mean"]
         if "edr_7d_mean" in latest.columns
-        else pd.Series([pd.NA] * n, index=idx)
+        else pd.Series(float("nan"), index=idx, dtype=float)
     )
 
     edr_raw = (
         latest["edr_raw"]
         if "edr_raw" in latest.columns
-        else pd.Series([0.0] * n, index=idx)
+        else pd.Series(0.0, index=idx, dtype=float)
     )
 
     level_series = edr_7d.fillna(edr_raw).astype(float)
@@ -57,7 +57,7 @@ def _score_v1(latest: pd.DataFrame) -> pd.Series:
     if "edr_mom" in latest.columns:
         mom_series = latest["edr_mom"].astype(float)
     else:
-        mom_series = pd.Series([0.0] * n, index=idx)
+        mom_series = pd.Series(0.0, index=idx, dtype=float)
 
     mom = mom_series.fillna(0.0).rank(pct=True)
 
@@ -66,7 +66,7 @@ def _score_v1(latest: pd.DataFrame) -> pd.Series:
     if "edr_14d_vol" in latest.columns:
         risk_series = latest["edr_14d_vol"].astype(float)
     else:
-        risk_series = pd.Series([0.0] * n, index=idx)
+        risk_series = pd.Series(0.0, index=idx, dtype=float)
 
     risk = risk_series.fillna(0.0).rank(pct=True)
 
@@ -91,7 +91,7 @@ def rebalance_weekly(features: pd.DataFrame, rebalance_date: str, params: Rebala
     df = cast(pd.DataFrame, df[df["snapshot_date"] <= reb_date])
 
     sorted_df = cast(pd.DataFrame, df.sort_values(by=["universeId", "snapshot_date"]))
-    latest = cast(pd.DataFrame, sorted_df.groupby("universeId", as_index=False).tail(1))
+    latest = cast(pd.DataFrame, sorted_df.loc[sorted_df["universeId"].notna()].drop_duplicates("universeId", keep="last"))
 
     # -- Eligibility
 
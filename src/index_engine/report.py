@@ -1,10 +1,13 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Optional, List, cast
+from typing import Optional, List
 
+import numpy as np
 import pandas as pd
 
+from .index_level import coerce_numeric
+
 
 def _as_df(obj: object) -> pd.DataFrame:
     """
@@ -21,17 +24,15 @@ def _as_df(obj: object) -> pd.DataFrame:
 
 def _series_float(df: pd.DataFrame, col: str, default: float = 0.0) -> pd.Series:
     if col in df.columns:
-        raw = pd.to_numeric(df[col], errors="coerce")
-        s = pd.Series(raw, index=df.index, dtype="float64").fillna(default)
-        return cast(pd.Series, s)
-    return pd.Series([default] * len(df), index=df.index, dtype="float64")
+        return coerce_numeric(df[col]).astype("float64").fillna(default)
+    return pd.Series(default, index=df.index, dtype="float64")
 
 
-def _series_str(df: pd.DataFrame, col: str, default: str = "") -> pd.Series:
-    if col in df.columns:
-        s = pd.Series(df[col], index=df.index).astype("string").fillna(default)
-        return cast(pd.Series, s)
-    return pd.Series([default] * len(df), index=df.index, dtype="string")
+def _series_id(df: pd.DataFrame) -> pd.Series:
+    """universeId as a numeric Series aligned to df.index; missing/unparseable -> NaN."""
+    if "universeId" in df.columns:
+        return coerce_numeric(df["universeId"])
+    return pd.Series(np.nan, index=df.index, dtype="float64")
 
 
 def _fmt_pct(x: float, digits: int = 2) -> str:
@@ -41,35 +42,58 @@ def _fmt_pct(x: float, digits: int = 2) -> str:
         return "—"
 
 
-def _fmt_num(x: float, digits: int = 2) -> str:
-    try:
-        v = float(x)
-        av = abs(v)
-        if av >= 1_000_000:
-            return f"{v / 1_000_000:.{digits}f}M"
-        if av >= 1_000:
-            return f"{v / 1_000:.{digits}f}K"
-        return f"{v:.{digits}f}"
-    except Exception:
-        return "—"
+def _fmt_pct_series(s: pd.Series, digits: int = 2) -> pd.Series:
+    """Vectorized _fmt_pct: 0.1234 -> '12.34%'."""
+    v = s.to_numpy(dtype=np.float64) * 100.0
+    out = np.char.add(np.char.mod(f"%.{digits}f", v), "%")
+    return pd.Series(out, index=s.index, dtype=object)
+
+
+def _fmt_num_series(s: pd.Series, digits: int = 2) -> pd.Series:
+    """Compact number format with K/M suffix: 1234567 -> '1.23M', 1234 -> '1.23K'."""
+    v = s.to_numpy(dtype=np.float64)
+    av = np.abs(v)
+    scale = np.where(av >= 1_000_000, 1_000_000.0, np.where(av >= 1_000, 1_000.0, 1.0))
+    suffix = np.where(av >= 1_000_000, "M", np.where(av >= 1_000, "K", ""))
+    out = np.char.add(np.char.mod(f"%.{digits}f", v / scale), suffix)
+    return pd.Series(out, index=s.index, dtype=object)
 
 
 def _safe_sort_by_rank(df: pd.DataFrame) -> pd.DataFrame:
     out = df.copy()
     if "rank" in out.columns:
-        raw = pd.to_numeric(out["rank"], errors="coerce")
-        out["rank"] = pd.Series(raw, index=out.index)
+        out["rank"] = coerce_numeric(out["rank"])
         by_cols: List[str] = ["rank"]
         out = out.sort_values(by=by_cols, kind="stable")
     return out
 
 
+def _md_cell(v: object) -> str:
+    if v is None or (not isinstance(v, str) and pd.isna(v)):  # type: ignore[arg-type]
+        return ""
+    if isinstance(v, float):
+        return f"{v:g}"
+    return str(v)
+
+
 def _to_markdown_table(df: pd.DataFrame, cols: List[str], n: int) -> str:
     existing: List[str] = [c for c in cols if c in df.columns]
     if not existing:
         return "_(no columns available)_"
     view = df.loc[:, existing].head(n)
-    return view.to_markdown(index=False)
+
+    # Plain pipe table (no tabulate): numeric columns right-aligned, text left-aligned
+    cells: List[List[str]] = [[_md_cell(v) for v in view[c].tolist()] for c in existing]
+    widths: List[int] = [max([len(c), *(len(v) for v in col)]) for c, col in zip(existing, cells)]
+    right: List[bool] = [pd.api.types.is_numeric_dtype(view[c]) for c in existing]
+
+    def fmt_row(values: List[str]) -> str:
+        return "| " + " | ".join(v.rjust(w) if r else v.ljust(w) for v, w, r in zip(values, widths, right)) + " |"
+
+    header = fmt_row(existing)
+    sep = "|" + "|".join("-" * (w + 1) + ":" if r else ":" + "-" * (w + 1) for w, r in zip(widths, right)) + "|"
+    rows = [fmt_row(list(r)) for r in zip(*cells)]
+    return "\n".join([header, sep, *rows])
 
 
 def write_weekly_report(
@@ -102,15 +126,15 @@ def write_weekly_report(
     top_view = df.copy()
 
     if "weight" in top_view.columns:
-        top_view["weight"] = _series_float(top_view, "weight", 0.0).map(lambda v: _fmt_pct(float(v), 2))
+        top_view["weight"] = _fmt_pct_series(_series_float(top_view, "weight", 0.0), 2)
 
     for col in ("edr_7d_mean", "edr_raw"):
         if col in top_view.columns:
-            top_view[col] = _series_float(top_view, col, 0.0).map(lambda v: _fmt_num(float(v), 2))
+            top_view[col] = _fmt_num_series(_series_float(top_view, col, 0.0), 2)
 
     for col in ("edr_mom", "edr_14d_vol"):
         if col in top_view.columns:
-            top_view[col] = _series_float(top_view, col, 0.0).map(lambda v: _fmt_num(float(v), 3))
+            top_view[col] = _fmt_num_series(_series_float(top_view, col, 0.0), 3)
 
     top_cols: List[str] = ["rank", "name", "developer", "weight", "edr_7d_mean", "edr_mom", "edr_14d_vol"]
     lines.append(_to_markdown_table(top_view, top_cols, n=10))
@@ -122,41 +146,43 @@ def write_weekly_report(
     if not mh.empty:
         if "rebalance_date" in mh.columns:
             mh = mh.copy()
-            mh["rebalance_date"] = pd.to_datetime(mh["rebalance_date"], errors="coerce").dt.date.astype(str)
+            reb_dt = pd.to_datetime(mh["rebalance_date"], errors="coerce")
+            mh["rebalance_date"] = reb_dt.dt.strftime("%Y-%m-%d")  # unparseable -> NaN
 
         prior_date: Optional[str] = None
         if "rebalance_date" in mh.columns:
-            date_list = mh["rebalance_date"].dropna().astype(str).tolist()
-            dates = sorted({d for d in date_list if d != rebalance_date})
-            if dates:
-                prior_date = dates[-1]
+            dates = mh["rebalance_date"].dropna().drop_duplicates().sort_values()
+            dates = dates[dates != rebalance_date]
+            if not dates.empty:
+                prior_date = str(dates.iloc[-1])
 
         if prior_date is not None:
             prior = _as_df(mh[mh["rebalance_date"] == prior_date]).copy()
 
-            curr_ids = set(_series_str(df, "universeId", "").tolist())
-            prior_ids = set(_series_str(prior, "universeId", "").tolist())
+            # Compare ids numerically on both sides (export and membership may differ in dtype)
+            curr_ids = _series_id(df)
+            prior_ids = _series_id(prior)
 
-            entrant_ids = curr_ids - prior_ids
-            exit_ids = prior_ids - curr_ids
+            entrant_ids = np.setdiff1d(curr_ids.dropna().to_numpy(), prior_ids.dropna().to_numpy())
+            exit_ids = np.setdiff1d(prior_ids.dropna().to_numpy(), curr_ids.dropna().to_numpy())
 
             lines.append(f"\n## Changes vs {prior_date}\n")
 
-            if entrant_ids and "universeId" in df.columns:
-                entrants = _as_df(df[df["universeId"].isin(list(entrant_ids))]).copy()
+            if entrant_ids.size and "universeId" in df.columns:
+                entrants = _as_df(df[curr_ids.isin(entrant_ids)]).copy()
                 entrants = _safe_sort_by_rank(entrants)
 
                 ent_view = entrants.copy()
                 if "weight" in ent_view.columns:
-                    ent_view["weight"] = _series_float(ent_view, "weight", 0.0).map(lambda v: _fmt_pct(float(v), 2))
+                    ent_view["weight"] = _fmt_pct_series(_series_float(ent_view, "weight", 0.0), 2)
 
                 lines.append("### New entrants\n")
                 ent_cols: List[str] = ["rank", "name", "developer", "weight", "universeId"]
                 lines.append(_to_markdown_table(ent_view, ent_cols, n=25))
                 lines.append("")
 
-            if exit_ids and "universeId" in prior.columns:
-                exits = _as_df(prior[prior["universeId"].isin(list(exit_ids))]).copy()
+            if exit_ids.size and "universeId" in prior.columns:
+                exits = _as_df(prior[prior_ids.isin(exit_ids)]).copy()
                 exits = _safe_sort_by_rank(exits)
 
                 lines.append("### Exits\n")
@@ -170,9 +196,7 @@ def write_weekly_report(
     lines.append("\n## Data quality\n")
     for col in ("monetization_count", "edr_7d_mean", "score"):
         if col in df.columns:
-            raw = pd.to_numeric(df[col], errors="coerce")
-            s = pd.Series(raw, index=df.index)  # force Series
-            missing = int(s.isna().sum())
+            missing = int(coerce_numeric(df[col]).isna().sum())
             lines.append(f"- Missing `{col}`: **{missing}/{len(df)}**")
         else:
             lines.append(f"- Missing `{col}`: **{len(df)}/{len(df)}** (column absent)")